@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试 - 在 CPython 下用替身模块运行游戏、显示、Web 的热点路径
+@author: @Suroy
+@site: https://suroy.cn/
+@email: suroy@qq.com
+@time: 2025/10/22
+
+用法:
+    python bench/benchmark.py                  # 运行并与 bench/baseline.json 比较
+    python bench/benchmark.py --output out.json
+    python bench/benchmark.py --update         # 用本次结果更新基线
+
+结果以 JSON 输出；METRICS 中的指标比基线差出容差即返回非零退出码。
+耗时类指标分多轮测量，每轮前后都运行一次校准循环；测量值和校准值各取最小，
+相除后再与基线比较，以抵消机器快慢和后台负载；原始耗时只作参考。
+"""
+import argparse
+import builtins
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# 参与比较的指标: (方向, 相对容差)。higher 表示越大越好，lower 表示越小越好
+# 其余结果（原始耗时、帧率、回环吞吐量）随机器和负载变化，只作参考
+METRICS = {
+    "game.logic_norm": ("lower", 0.5),
+    "game.alloc_bytes_per_tick": ("lower", 0.25),
+    "display.show_transactions": ("lower", 0),
+    "display.show_bytes": ("lower", 0),
+    "web.errors": ("lower", 0),
+    "response.status_norm": ("lower", 0.5),
+    "response.scores_norm": ("lower", 0.5),
+    "response.html_norm": ("lower", 0.5),
+    "response.status_bytes": ("lower", 0.05),
+    "response.scores_bytes": ("lower", 0.05),
+    "response.html_bytes": ("lower", 0.05),
+}
+
+# 经 handle_request 测量的响应: 名称 -> 请求路径
+RESPONSE_PATHS = (("status", "status"), ("scores", "scores"), ("html", ""))
+
+WEB_PATHS = ("status", "scores", "left", "right", "memory", "")
+
+
+class VirtualClock:
+    """替代 MicroPython 的 ticks_*/sleep_ms，睡眠只推进虚拟时间，使结果可复现"""
+
+    def __init__(self):
+        self.now_us = 0
+
+    def ticks_ms(self):
+        return self.now_us // 1000
+
+    def ticks_us(self):
+        return self.now_us
+
+    def ticks_diff(self, new, old):
+        return new - old
+
+    def sleep_ms(self, ms):
+        self.now_us += ms * 1000
+
+    def install(self):
+        time.ticks_ms = self.ticks_ms
+        time.ticks_us = self.ticks_us
+        time.ticks_diff = self.ticks_diff
+        time.sleep_ms = self.sleep_ms
+
+
+class LoopbackClient:
+    """给 CPython socket 补上 MicroPython 风格的 readinto 和字符串发送"""
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def readinto(self, buf):
+        return self.sock.recv_into(buf)
+
+    def send(self, data):
+        return self.sock.send(data.encode() if isinstance(data, str) else data)
+
+    def sendall(self, data):
+        self.sock.sendall(data.encode() if isinstance(data, str) else data)
+
+    def close(self):
+        self.sock.close()
+
+
+class MemoryClient:
+    """内存中的客户端: 每次读取返回同一请求，发送时和 CPython socket 一样需要编码"""
+
+    def __init__(self, request):
+        self.request = request
+        self.sent = 0
+
+    def readinto(self, buf):
+        size = len(self.request)
+        buf[:size] = self.request
+        return size
+
+    def send(self, data):
+        data = data.encode() if isinstance(data, str) else data
+        self.sent += len(data)
+        return len(data)
+
+    def sendall(self, data):
+        self.send(data)
+
+    def close(self):
+        pass
+
+
+def setup_environment():
+    """让仓库代码在 CPython 下可导入: 替身模块、const 内建函数和虚拟时钟"""
+    sys.path.insert(0, os.path.join(BENCH_DIR, "stubs"))
+    sys.path.insert(0, ROOT_DIR)
+    builtins.const = lambda value: value
+    VirtualClock().install()
+
+
+def create_game():
+    """创建不启动网络的游戏实例（setup_network 会绑定 80 端口并等待 3 秒）"""
+    import main
+    main.Game.setup_network = lambda self: None
+    random.seed(2025)
+    game = main.Game()
+    game.memory.start()  # 与 Game.run 一致，帧时间从循环开始计
+    return game
+
+
+ROUNDS = 25
+ROUND_US = 1000  # 每轮控制在一个调度时间片以内，才有机会测到未被打断的轮次
+
+
+def calibrate():
+    """参考负载: 与热点路径同类的字典、字符串和整数运算，返回耗时（微秒）"""
+    start = time.perf_counter()
+    data = {}
+    for i in range(3000):
+        key = "k{}".format(i & 63)
+        data[key] = data.get(key, 0) + i
+    ",".join(data)
+    return (time.perf_counter() - start) * 1e6
+
+
+def measure(run, rounds=ROUNDS):
+    """run() 返回 (总耗时秒, 次数)。返回 (最短单次耗时微秒, 归一化耗时)
+
+    归一化耗时以校准负载的千分之一为单位。校准与测量交替进行，各自取最小值，
+    被调度打断的轮次因此不影响结果。
+    """
+    best_us = best_calibration = None
+    for _ in range(rounds):
+        calibration = calibrate()
+        best_calibration = calibration if best_calibration is None else min(best_calibration, calibration)
+        elapsed, count = run()
+        us = elapsed / count * 1e6
+        best_us = us if best_us is None else min(best_us, us)
+    best_calibration = min(best_calibration, calibrate())
+    return round(best_us, 2), round(best_us * 1000 / best_calibration, 3)
+
+
+def bench_game(game, ticks):
+    """整帧帧率只作参考；参与比较的是不含绘制的游戏逻辑耗时"""
+    start = time.perf_counter()
+
+    def run():
+        logic = 0.0
+        logic_ticks = 0
+        for _ in range(ticks // ROUNDS):
+            if game.game_over:
+                game.step()
+                continue
+            begin = time.perf_counter()
+            game.update()
+            logic += time.perf_counter() - begin
+            logic_ticks += 1
+            game.draw_screen()
+            game.memory.idle(game.FRAME_SLACK_MS)
+        return logic, max(logic_ticks, 1)
+
+    logic_us, logic_norm = measure(run)
+    elapsed = time.perf_counter() - start
+    return {
+        "game.fps": round(ticks // ROUNDS * ROUNDS / elapsed, 1),
+        "game.logic_us_per_tick": logic_us,
+        "game.logic_norm": logic_norm,
+    }
+
+
+def bench_alloc_per_tick(game, ticks):
+    tracemalloc.start()
+    total = 0
+    for _ in range(ticks):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        game.step()
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return {"game.alloc_bytes_per_tick": round(total / ticks, 1)}
+
+
+def bench_display_show(game):
+    i2c = game.oled.i2c
+    transactions, written = i2c.transactions, i2c.bytes_written
+    game.oled.show()
+    return {
+        "display.show_transactions": i2c.transactions - transactions,
+        "display.show_bytes": i2c.bytes_written - written,
+    }
+
+
+def bench_responses(web, max_iterations):
+    """经 handle_request 处理完整请求: 解析、生成响应体、编码和发送"""
+    results = {}
+    for name, path in RESPONSE_PATHS:
+        request = "GET /{} HTTP/1.1\r\nHost: esp32\r\n\r\n".format(path).encode()
+        client = MemoryClient(request)
+        start = time.perf_counter()
+        web.handle_request(client)
+        single_us = (time.perf_counter() - start) * 1e6
+        iterations = max(1, min(max_iterations, int(ROUND_US / single_us)))
+
+        def run():
+            start = time.perf_counter()
+            for _ in range(iterations):
+                client.sent = 0
+                web.handle_request(client)
+            return time.perf_counter() - start, iterations
+
+        us, norm = measure(run)
+        results["response.{}_us".format(name)] = us
+        results["response.{}_norm".format(name)] = norm
+        results["response.{}_bytes".format(name)] = client.sent
+    return results
+
+
+def _web_client(port, paths, requests, errors, lock):
+    for i in range(requests):
+        path = paths[i % len(paths)]
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=10) as sock:
+                sock.sendall("GET /{} HTTP/1.1\r\nHost: esp32\r\n\r\n".format(path).encode())
+                response = b""
+                while True:
+                    chunk = sock.recv(4096)
+                    if not chunk:
+                        break
+                    response += chunk
+            ok = response.startswith(b"HTTP/1.1 200")
+        except OSError:
+            ok = False
+        if not ok:
+            with lock:
+                errors.append(path)
+
+
+def bench_web(game, web, clients, requests_per_client):
+    """多个并发客户端经回环地址请求，服务端串行调用 handle_request"""
+    port = web.server.getsockname()[1]
+    # 设备上 backlog 为 1；这里放大以免连接排队重试掩盖 handle_request 本身的开销
+    web.server.listen(clients)
+    web.server.settimeout(10)
+
+    errors = []
+    lock = threading.Lock()
+    threads = []
+    for i in range(clients):
+        # 每个客户端从不同路径开始轮询，让各类请求交错到达
+        offset = i % len(WEB_PATHS)
+        paths = WEB_PATHS[offset:] + WEB_PATHS[:offset]
+        threads.append(threading.Thread(target=_web_client, args=(port, paths, requests_per_client, errors, lock)))
+    total = clients * requests_per_client
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    handled = 0
+    while handled < total:
+        try:
+            client, _ = web.server.accept()
+        except OSError:
+            break
+        client.settimeout(10)
+        web.handle_request(LoopbackClient(client))
+        web.get_web_commands()
+        handled += 1
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "web.requests_per_s": round(handled / elapsed, 1),
+        "web.errors": len(errors) + total - handled,
+    }
+
+
+def run_benchmarks(quick=False):
+    setup_environment()
+    from web_server import WebServer
+
+    scale = 10 if quick else 1
+    workdir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # ScoreStore 在当前目录读写段文件，不能污染仓库
+        os.chdir(tmp)
+        try:
+            game = create_game()
+            web = WebServer(game, port=0)
+            try:
+                results = {}
+                results.update(bench_game(game, 4000 // scale))
+                results.update(bench_alloc_per_tick(game, 500 // scale))
+                results.update(bench_display_show(game))
+                results.update(bench_responses(web, 200 // scale))
+                results.update(bench_web(game, web, 16, 25 // scale or 1))
+            finally:
+                web.stop()
+        finally:
+            os.chdir(workdir)
+    return results
+
+
+def compare(results, baseline):
+    """返回超出容差的指标列表，只比较 METRICS 中的指标"""
+    regressions = []
+    for name, (direction, tolerance) in METRICS.items():
+        if name not in results or name not in baseline:
+            continue
+        value, base = results[name], baseline[name]
+        if direction == "higher":
+            failed = value < base * (1 - tolerance)
+        else:
+            failed = value > base * (1 + tolerance)
+        if failed:
+            regressions.append({"metric": name, "value": value, "baseline": base, "direction": direction})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Block Dodge 热点路径基准测试")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--output", help="结果写入的 JSON 文件")
+    parser.add_argument("--update", action="store_true", help="用本次结果覆盖基线")
+    parser.add_argument("--quick", action="store_true", help="缩小迭代次数，用于快速检查")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(quick=args.quick)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = [] if args.update else compare(results, baseline)
+
+    report = {
+        "python": sys.version.split()[0],
+        "results": results,
+        "gated": sorted(METRICS),
+        "regressions": regressions,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump({name: results[name] for name in METRICS}, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
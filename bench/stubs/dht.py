@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+"""
+dht 模块替身 - 返回固定的温湿度
+"""
+
+
+class DHT11:
+    def __init__(self, pin):
+        self.pin = pin
+
+    def measure(self):
+        pass
+
+    def temperature(self):
+        return 25
+
+    def humidity(self):
+        return 60
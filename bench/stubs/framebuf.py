@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""
+framebuf 模块替身 - MONO_VLSB 单色帧缓冲
+每个字节表示一列中竖直排列的 8 个像素，与 SSD1306 显存布局一致；
+fill 和 pixel 真正写缓冲，fill_rect/text 等只计数
+"""
+
+MONO_VLSB = 0
+
+
+class FrameBuffer:
+    """绘制操作只计数不画像素，使基准测试时间落在仓库代码而不是替身上"""
+
+    def __init__(self, buf, width, height, buf_format=MONO_VLSB):
+        self.buf = buf
+        self.width = width
+        self.height = height
+        self.ops = 0
+        self._blank = bytes(len(buf))
+        self._solid = b'\xff' * len(buf)
+
+    def fill(self, col):
+        self.ops += 1
+        self.buf[:] = self._solid if col else self._blank
+
+    def pixel(self, x, y, col=None):
+        self.ops += 1
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        index = (y >> 3) * self.width + x
+        mask = 1 << (y & 7)
+        if col is None:
+            return 1 if self.buf[index] & mask else 0
+        if col:
+            self.buf[index] |= mask
+        else:
+            self.buf[index] &= ~mask & 0xFF
+
+    def fill_rect(self, x, y, w, h, col):
+        self.ops += 1
+
+    def text(self, string, x, y, col=1):
+        self.ops += 1
+
+    def scroll(self, dx, dy):
+        self.ops += 1
+
+
+def FrameBuffer1(buf, width, height):
+    return FrameBuffer(buf, width, height, MONO_VLSB)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""
+machine 模块替身 - 在 CPython 下运行基准测试用
+记录 I2C/SPI 的事务数和字节数，按键始终处于未按下状态（高电平）
+"""
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 2
+
+    def __init__(self, pin_id, mode=None, pull=None, value=1):
+        self.id = pin_id
+        self._value = value
+
+    def init(self, mode=None, value=None):
+        if value is not None:
+            self._value = value
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._value = value
+
+    def high(self):
+        self._value = 1
+
+    def low(self):
+        self._value = 0
+
+
+class I2C:
+    def __init__(self, bus_id, scl=None, sda=None, freq=400000):
+        self.transactions = 0
+        self.bytes_written = 0
+
+    def writeto(self, addr, buf):
+        self.transactions += 1
+        self.bytes_written += len(buf)
+        return len(buf)
+
+
+class SPI:
+    def __init__(self, bus_id, *args, **kwargs):
+        self.transactions = 0
+        self.bytes_written = 0
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def write(self, buf):
+        self.transactions += 1
+        self.bytes_written += len(buf)
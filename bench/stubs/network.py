@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""
+network 模块替身 - 模拟 AP 模式的 WLAN 接口
+"""
+
+STA_IF = 0
+AP_IF = 1
+
+
+class WLAN:
+    def __init__(self, interface):
+        self.interface = interface
+        self._active = False
+        self._config = {}
+
+    def active(self, is_active=None):
+        if is_active is None:
+            return self._active
+        self._active = is_active
+
+    def config(self, **kwargs):
+        self._config.update(kwargs)
+
+    def ifconfig(self):
+        return ('192.168.4.1', '255.255.255.0', '192.168.4.1', '192.168.4.1')
+
+    def status(self, param=None):
+        return {'stations': []}
@@ -14,6 +14,8 @@ from machine import Pin, I2C
 from ssd1306 import SSD1306_I2C
 from network_config import NetworkConfig
 from web_server import WebServer
+from score_store import ScoreStore
+from memory_policy import MemoryPolicy
 
 
 class DHTSensor:
@@ -42,11 +44,15 @@ class DHTSensor:
 class Game:
     
     def __init__(self):
+        # 内存策略最先创建，让帧缓冲等长期缓冲区在干净的堆上分配
+        self.memory = MemoryPolicy()
+
         # OLED
         self.WIDTH = 128
         self.HEIGHT = 64
         self.i2c = I2C(0, scl=Pin(10), sda=Pin(9))
         self.oled = SSD1306_I2C(self.WIDTH, self.HEIGHT, self.i2c)
+        self.memory.track("framebuf", self.oled.buffer)
         self.dht = DHTSensor()
 
         # 按键配置
@@ -61,6 +67,7 @@ class Game:
         self.PLAYER_Y = self.HEIGHT - self.PLAYER_SIZE - 1
         self.BLOCK_SIZE = 8
         self.BLOCK_SPEED = 1
+        self.FRAME_SLACK_MS = 50  # 每帧末尾的空闲时间，GC 在其中执行
         self.SPAWN_RATE = 1.5  # 每隔多少秒生成一个新方块
 
         self.blocks = []
@@ -68,6 +75,13 @@ class Game:
         self.game_over = False
         self.gen_block = True
         self.last_spawn_time = 0
+
+        # 对局统计，游戏结束时批量写入闪存
+        self.scores = ScoreStore()
+        self.session_start = 0
+        self.session_saved = True
+        self.web_moves = 0
+        self.button_moves = 0
         
         self.ENABLE_DEBUG = False
         
@@ -110,14 +124,29 @@ class Game:
             self.debug_log(f"网络设置失败: {e}")
             
     def reset_game(self):
+        self.end_session()
         self.PLAYER_X = self.WIDTH // 2 - self.PLAYER_SIZE // 2
         self.blocks = []
         self.score = 0
         self.game_over = False
         self.gen_block = True
         self.last_spawn_time = time.ticks_ms()
+        self.session_start = time.ticks_ms()
+        self.session_saved = False
+        self.web_moves = 0
+        self.button_moves = 0
         self.debug_log("游戏重置！")
 
+    def end_session(self):
+        """记录本局统计（只写内存，由 scores.flush 在帧循环外批量落盘）"""
+        if self.session_saved:
+            return
+        self.session_saved = True
+        if self.score == 0 and self.web_moves == 0 and self.button_moves == 0:
+            return  # 未开始游玩的对局不记录，避免反复重启磨损闪存
+        duration = time.ticks_diff(time.ticks_ms(), self.session_start)
+        self.scores.record_session(self.score, self.score, duration, self.web_moves, self.button_moves)
+
     def draw_player(self):
         self.oled.framebuf.fill_rect(self.PLAYER_X, self.PLAYER_Y, self.PLAYER_SIZE, self.PLAYER_SIZE, 1)
 
@@ -143,6 +172,7 @@ class Game:
         self.oled.text("SUROY PROJECT", 10, 0, 1)
         self.oled.text("Game Over!", self.WIDTH // 2 - 40, self.HEIGHT // 2 - 10, 1)
         self.oled.text("Score: {}".format(self.score), self.WIDTH // 2 - 35, self.HEIGHT // 2 + 5, 1)
+        self.oled.text("Best: {}".format(self.scores.high_score()), self.WIDTH // 2 - 35, self.HEIGHT // 2 + 15, 1)
         self.oled.show()
 
     def handle_input(self):
@@ -152,12 +182,14 @@ class Game:
         # 读取按键状态 - 向右移动
         if self.button_right.value() == 0:  # 按键按下 (低电平)
             self.PLAYER_X = min(self.WIDTH - self.PLAYER_SIZE, self.PLAYER_X + self.PLAYER_SIZE // 2)
+            self.button_moves += 1
             while self.button_right.value() == 0:  # 等待按键释放
                 time.sleep_ms(10)
 
         # 读取按键状态 - 向左移动
         if self.button_left.value() == 0:  # 按键按下 (低电平)
             self.PLAYER_X = max(0, self.PLAYER_X - self.PLAYER_SIZE // 2)
+            self.button_moves += 1
             while self.button_left.value() == 0:  # 等待按键释放
                 time.sleep_ms(10)
                 
@@ -172,9 +204,11 @@ class Game:
             for command in commands:
                 if command == 'left':
                     self.PLAYER_X = max(0, self.PLAYER_X - self.PLAYER_SIZE // 2)
+                    self.web_moves += 1
                     self.debug_log("Web控制: 左移")
                 elif command == 'right':
                     self.PLAYER_X = min(self.WIDTH - self.PLAYER_SIZE, self.PLAYER_X + self.PLAYER_SIZE // 2)
+                    self.web_moves += 1
                     self.debug_log("Web控制: 右移")
                     
             self.last_web_check = time.ticks_ms()
@@ -219,19 +253,30 @@ class Game:
         self.display_score()
         self.oled.show()
 
+    def update(self):
+        """一帧的游戏逻辑部分（不含绘制）"""
+        self.handle_input()
+        self.spawn_blocks()
+        self.update_blocks()
+        self.check_collisions()
+
+    def step(self):
+        """执行一帧（游戏结束时则显示结束画面并重开）"""
+        if not self.game_over:
+            self.update()
+            self.draw_screen()
+            self.memory.idle(self.FRAME_SLACK_MS)
+        else:
+            self.end_session()
+            self.display_game_over()
+            self.scores.flush()  # 在结束画面停留期间落盘，不占用游戏帧
+            self.memory.pause(2000)
+            self.reset_game()
+
     def run(self):
+        self.memory.start()
         while True:
-            if not self.game_over:
-                self.handle_input()
-                self.spawn_blocks()
-                self.update_blocks()
-                self.check_collisions()
-                self.draw_screen()
-                time.sleep_ms(50)
-            else:
-                self.display_game_over()
-                time.sleep(2)
-                self.reset_game()
+            self.step()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+内存策略模块 - 控制垃圾回收时机，统计堆和GC停顿
+@author: @Suroy
+@site: https://suroy.cn/
+@email: suroy@qq.com
+@time: 2025/10/21
+
+MicroPython 默认在堆耗尽时才回收，可能恰好落在刷屏或处理HTTP请求中间，
+造成 10~30ms 的帧抖动。这里的做法:
+- 启动时集中分配长期使用的大缓冲区，避免之后堆被切碎
+- gc.threshold 只作为兜底，正常情况下在每帧末尾的空闲时间里回收
+- 只有剩余空闲时间足够容纳一次回收（按历史最长停顿估计）时才执行，否则推迟到下一帧
+- 最大空闲块的探测会触发额外回收，只在结束画面的停顿中进行，接口只返回缓存值
+"""
+import gc
+import time
+
+
+class MemoryPolicy:
+    def __init__(self, collect_fraction=16, threshold_fraction=4):
+        # CPython 下 gc 没有 mem_free/threshold，此时只统计帧时间
+        self.enabled = hasattr(gc, 'mem_free')
+
+        self.buffers = {}
+        self.heap_size = 0
+        self.high_water = 0
+        self.collect_step = 0
+        self.last_alloc = 0
+
+        # GC 停顿统计（微秒）
+        self.gc_count = 0
+        self.gc_last_us = 0
+        self.gc_max_us = 0
+        self.gc_total_us = 0
+        self.gc_estimate_ms = 2  # 预计一次回收耗时，用于判断空闲时间是否足够
+
+        # 帧时间统计（毫秒，不含空闲等待）
+        self.frame_last_ms = 0
+        self.frame_max_ms = 0
+        self.frame_start = time.ticks_ms()
+
+        # 最大连续空闲块，只在 pause() 中探测
+        self.largest_free = 0
+        self.fragmentation_pct = 0
+
+        if self.enabled:
+            gc.collect()
+            self.heap_size = gc.mem_free() + gc.mem_alloc()
+            # 分配量超过 collect_step 后在空闲时间回收；超过阈值则由 MicroPython 强制回收
+            self.collect_step = self.heap_size // collect_fraction
+            gc.threshold(self.heap_size // threshold_fraction)
+            self.last_alloc = gc.mem_alloc()
+            self.high_water = self.last_alloc
+
+    def alloc(self, name, size):
+        """启动时分配长期使用的缓冲区，先回收以便缓冲区落在连续空间"""
+        if self.enabled:
+            gc.collect()
+        buf = bytearray(size)
+        self.buffers[name] = size
+        if self.enabled:
+            self.last_alloc = gc.mem_alloc()
+            self.high_water = max(self.high_water, self.last_alloc)
+        return buf
+
+    def track(self, name, buf):
+        """登记由其他模块自行分配的长期缓冲区（如显示驱动的帧缓冲）"""
+        self.buffers[name] = len(buf)
+
+    def collect(self):
+        """执行一次回收并记录停顿时间"""
+        if not self.enabled:
+            return
+        alloc = gc.mem_alloc()
+        self.high_water = max(self.high_water, alloc)
+        start = time.ticks_us()
+        gc.collect()
+        pause = time.ticks_diff(time.ticks_us(), start)
+        self.gc_count += 1
+        self.gc_last_us = pause
+        self.gc_max_us = max(self.gc_max_us, pause)
+        self.gc_total_us += pause
+        self.gc_estimate_ms = self.gc_max_us // 1000 + 1
+        self.last_alloc = gc.mem_alloc()
+
+    def start(self):
+        """帧循环开始前调用，清除启动阶段（网络、存档加载等）计入的帧时间"""
+        self.frame_last_ms = 0
+        self.frame_max_ms = 0
+        self.frame_start = time.ticks_ms()
+
+    def idle(self, slack_ms):
+        """帧末尾调用: 统计帧时间，必要时在空闲时间回收，然后睡满 slack_ms"""
+        start = time.ticks_ms()
+        frame = time.ticks_diff(start, self.frame_start)
+        self.frame_last_ms = frame
+        self.frame_max_ms = max(self.frame_max_ms, frame)
+
+        if self.enabled:
+            alloc = gc.mem_alloc()
+            self.high_water = max(self.high_water, alloc)
+            remaining = slack_ms - time.ticks_diff(time.ticks_ms(), start)
+            if alloc - self.last_alloc >= self.collect_step and remaining >= self.gc_estimate_ms:
+                self.collect()
+
+        remaining = slack_ms - time.ticks_diff(time.ticks_ms(), start)
+        if remaining > 0:
+            time.sleep_ms(remaining)
+        self.frame_start = time.ticks_ms()
+
+    def pause(self, ms):
+        """非游戏帧的停顿（如结束画面）: 探测碎片、完整回收后等待，不计入帧时间"""
+        if self.enabled:
+            # 探测会消耗 threshold 额度，随后的 collect 正好将其清零
+            free = gc.mem_free()
+            self.largest_free = self.largest_block()
+            self.fragmentation_pct = 100 - self.largest_free * 100 // free if free else 0
+        self.collect()
+        time.sleep_ms(ms)
+        self.frame_start = time.ticks_ms()
+
+    def largest_block(self):
+        """二分探测当前可分配的最大连续块
+
+        失败的分配会先触发一次完整回收，开销很大，只能在 pause() 中调用。
+        """
+        low, high = 0, gc.mem_free()
+        while high - low > 64:
+            mid = (low + high) // 2
+            try:
+                probe = bytearray(mid)
+                del probe
+                low = mid
+            except MemoryError:
+                high = mid
+        return low
+
+    def report(self):
+        """供 /memory 接口使用的内存统计，在帧内调用，不做任何分配探测"""
+        info = {
+            "frame_last_ms": self.frame_last_ms,
+            "frame_max_ms": self.frame_max_ms,
+            "gc_count": self.gc_count,
+            "gc_last_us": self.gc_last_us,
+            "gc_max_us": self.gc_max_us,
+            "gc_avg_us": self.gc_total_us // self.gc_count if self.gc_count else 0,
+            "buffers": self.buffers,
+        }
+        if self.enabled:
+            info["heap_size"] = self.heap_size
+            info["heap_free"] = gc.mem_free()
+            info["heap_high_water"] = self.high_water
+            # 以下两项为上次结束画面时的探测结果
+            info["largest_free_block"] = self.largest_free
+            info["fragmentation_pct"] = self.fragmentation_pct
+        return info
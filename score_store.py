@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分数存储模块 - 闪存上的最高分与对局统计
+@author: @Suroy
+@site: https://suroy.cn/
+@email: suroy@qq.com
+@time: 2025/10/20
+
+存储格式: 定长记录的追加日志，分布在两个轮换段文件中。
+- 每条记录 32 字节，带魔数和 CRC，掉电写坏的尾部记录在加载时被丢弃
+- 活动段写满后，把累计统计、前 N 名和最近几局压缩写入另一个段，再切换过去，
+  旧段在新段提交成功前保持完整
+- 对局结束时才批量落盘，游戏帧内只做内存操作
+"""
+import struct
+import binascii
+
+RECORD_FMT = '<BBHIIIIIII'  # 魔数, 类型, 附加字段, 序号, 字段a-e, CRC
+RECORD_SIZE = struct.calcsize(RECORD_FMT)
+RECORD_MAGIC = 0xB5
+
+KIND_SESSION = 1  # 一局: 分数, 躲避方块数, 时长(ms), Web操作数, 按键操作数
+KIND_CARRY = 2    # 轮换时带入新段的对局，字段同 KIND_SESSION，附加字段为 CARRY_* 标志
+KIND_TOTALS = 3   # 段提交标记: 局数, 躲避方块数, 总时长(s), Web操作数, 按键操作数；附加字段为时长不足1秒的毫秒数
+
+CARRY_TOP = 0x01     # 属于前N名
+CARRY_RECENT = 0x02  # 属于最近几局
+
+
+class ScoreStore:
+    def __init__(self, prefix="scores", segments=2, segment_records=64, top_n=5, recent_n=5, pending_max=16):
+        self.prefix = prefix
+        self.SEGMENTS = segments
+        self.SEGMENT_RECORDS = segment_records
+        self.TOP_N = top_n
+        self.RECENT_N = recent_n
+        self.PENDING_MAX = pending_max
+        if segment_records <= top_n + recent_n + 1:
+            raise ValueError("segment_records 必须大于 top_n + recent_n + 1")
+
+        # 内存索引
+        self.top = []      # [(分数, 躲避数, 时长ms, web, 按键, 序号)]，按分数降序
+        self.recent = []   # 最近几局，最新在后
+        self.games = 0
+        self.dodged = 0
+        self.play_ms = 0
+        self.web_moves = 0
+        self.button_moves = 0
+
+        self.seq = 0
+        self.active = -1       # 当前活动段，-1 表示尚未提交任何段
+        self.active_count = 0  # 活动段中有效记录数
+        self.pending = []      # 待落盘的对局
+
+        self._record = bytearray(RECORD_SIZE)
+        self.load()
+
+    def _segment_path(self, index):
+        return "{}{}.dat".format(self.prefix, index)
+
+    def _pack(self, buf, offset, kind, extra, seq, a, b, c, d, e):
+        struct.pack_into(RECORD_FMT, buf, offset, RECORD_MAGIC, kind, extra, seq,
+                         a & 0xFFFFFFFF, b & 0xFFFFFFFF, c & 0xFFFFFFFF,
+                         d & 0xFFFFFFFF, e & 0xFFFFFFFF, 0)
+        crc = binascii.crc32(memoryview(buf)[offset:offset + RECORD_SIZE - 4]) & 0xFFFFFFFF
+        struct.pack_into('<I', buf, offset + RECORD_SIZE - 4, crc)
+
+    def _unpack(self, buf):
+        """校验并解析一条记录，无效时返回 None"""
+        fields = struct.unpack(RECORD_FMT, buf)
+        if fields[0] != RECORD_MAGIC:
+            return None
+        if binascii.crc32(memoryview(buf)[:RECORD_SIZE - 4]) & 0xFFFFFFFF != fields[-1]:
+            return None
+        return fields[1], fields[2], fields[3], fields[4:9]
+
+    def _scan(self, index):
+        """读取一个段，返回 (有效记录列表, 提交标记序号)；遇到坏记录即停止"""
+        records = []
+        committed = -1
+        try:
+            with open(self._segment_path(index), 'rb') as f:
+                while f.readinto(self._record) == RECORD_SIZE:
+                    record = self._unpack(self._record)
+                    if record is None:
+                        break
+                    records.append(record)
+                    if record[0] == KIND_TOTALS:
+                        committed = record[2]
+        except OSError:
+            pass
+        return records, committed
+
+    def load(self):
+        """从闪存重建内存索引和累计计数"""
+        best = -1
+        records = []
+        for index in range(self.SEGMENTS):
+            seg_records, committed = self._scan(index)
+            if committed > best:
+                best = committed
+                records = seg_records
+                self.active = index
+        if best < 0:
+            return
+
+        self.active_count = len(records)
+        for kind, extra, seq, fields in records:
+            self.seq = max(self.seq, seq + 1)
+            if kind == KIND_TOTALS:
+                self.games, self.dodged, play_s, self.web_moves, self.button_moves = fields
+                self.play_ms = play_s * 1000 + extra
+            elif kind == KIND_CARRY:
+                entry = fields + (seq,)
+                if extra & CARRY_TOP:
+                    self._index(entry)
+                if extra & CARRY_RECENT:
+                    self.recent.append(entry)
+                    del self.recent[:-self.RECENT_N]
+            elif kind == KIND_SESSION:
+                self._apply(fields + (seq,))
+
+    def _index(self, entry):
+        """更新前N名索引"""
+        if len(self.top) >= self.TOP_N and entry[0] <= self.top[-1][0]:
+            return
+        self.top.append(entry)
+        self.top.sort(key=lambda item: item[0], reverse=True)
+        del self.top[self.TOP_N:]
+
+    def _apply(self, entry):
+        """把一局计入内存统计"""
+        score, dodged, duration, web, button, _ = entry
+        self.games += 1
+        self.dodged += dodged
+        self.play_ms += duration
+        self.web_moves += web
+        self.button_moves += button
+        self._index(entry)
+        self.recent.append(entry)
+        del self.recent[:-self.RECENT_N]
+
+    def record_session(self, score, dodged, duration_ms, web_moves, button_moves):
+        """记录一局（只改内存，不写闪存）"""
+        entry = (score, dodged, duration_ms, web_moves, button_moves, self.seq)
+        self.seq += 1
+        self._apply(entry)
+        self.pending.append(entry)
+        if len(self.pending) > self.PENDING_MAX:
+            # 闪存持续写入失败时丢弃最早的对局记录；其统计仍计入累计值，下次轮换时落盘
+            del self.pending[0]
+
+    def high_score(self):
+        return self.top[0][0] if self.top else 0
+
+    def flush(self):
+        """把待写入的对局批量落盘，应在帧循环之外调用（如游戏结束时）"""
+        if not self.pending:
+            return
+        try:
+            while self.pending:
+                room = self.SEGMENT_RECORDS - self.active_count
+                if self.active < 0 or room <= 0:
+                    self._rotate()
+                    continue
+                # 每次最多写满当前段，剩余的对局在轮换后继续写入
+                self._append(self.pending[:room])
+                del self.pending[:room]
+        except OSError as e:
+            print(f"分数保存失败: {e}")
+
+    def _append(self, entries):
+        buf = bytearray(RECORD_SIZE * len(entries))
+        for i, entry in enumerate(entries):
+            self._pack(buf, i * RECORD_SIZE, KIND_SESSION, 0, entry[5], *entry[:5])
+        with open(self._segment_path(self.active), 'r+b') as f:
+            # 从最后一条有效记录之后写，覆盖可能残留的半条记录
+            f.seek(self.active_count * RECORD_SIZE)
+            f.write(buf)
+        self.active_count += len(entries)
+
+    def _rotate(self):
+        """把前N名、最近几局和累计统计压缩写入下一个段；统计记录最后写入，作为提交标记
+
+        待写入的对局不折叠进新段，随后照常追加，因此要先从统计中扣除。
+        """
+        target = (self.active + 1) % self.SEGMENTS
+        flags = {}
+        for entry in self.top:
+            if entry not in self.pending:
+                flags[entry] = CARRY_TOP
+        for entry in self.recent:
+            if entry not in self.pending:
+                flags[entry] = flags.get(entry, 0) | CARRY_RECENT
+        # 按原序号排列，加载时最近几局的先后顺序不变
+        carry = sorted(flags, key=lambda item: item[5])
+        games, dodged, play_ms, web, button = self.games, self.dodged, self.play_ms, self.web_moves, self.button_moves
+        for entry in self.pending:
+            games -= 1
+            dodged -= entry[1]
+            play_ms -= entry[2]
+            web -= entry[3]
+            button -= entry[4]
+
+        count = len(carry) + 1
+        buf = bytearray(RECORD_SIZE * count)
+        for i, entry in enumerate(carry):
+            self._pack(buf, i * RECORD_SIZE, KIND_CARRY, flags[entry], self.seq, *entry[:5])
+            self.seq += 1
+        self._pack(buf, (count - 1) * RECORD_SIZE, KIND_TOTALS, play_ms % 1000, self.seq,
+                   games, dodged, play_ms // 1000, web, button)
+        self.seq += 1
+        with open(self._segment_path(target), 'wb') as f:
+            f.write(buf)
+        self.active = target
+        self.active_count = count
+
+    def summary(self):
+        """供 /scores 接口使用的统计摘要"""
+        def session(entry):
+            return {
+                "score": entry[0],
+                "dodged": entry[1],
+                "duration_ms": entry[2],
+                "web_moves": entry[3],
+                "button_moves": entry[4],
+            }
+
+        return {
+            "high_score": self.high_score(),
+            "games": self.games,
+            "dodged": self.dodged,
+            "play_s": self.play_ms // 1000,
+            "web_moves": self.web_moves,
+            "button_moves": self.button_moves,
+            "top": [session(entry) for entry in self.top],
+            "recent": [session(entry) for entry in reversed(self.recent)],
+        }
@@ -11,8 +11,19 @@ Web服务器模块 - 提供游戏控制接口
 import socket
 import re
 
+# MicroPython 的 str 支持缓冲区协议，可直接写入 memoryview；CPython 需先编码
+try:
+    memoryview(bytearray(1))[0:1] = 'a'
+    STR_IS_BUFFER = True
+except TypeError:
+    STR_IS_BUFFER = False
+
 
 class WebServer:
+    RECV_SIZE = 1024
+    JSON_SIZE = 2048  # /scores 约 1KB，留出余量
+    REQUEST_LINE_MAX = 128  # 只解码请求行，避免每次请求生成 1KB 字符串
+
     def __init__(self, game_instance, port=80):
         self.game = game_instance
         self.port = port
@@ -21,6 +32,15 @@ class WebServer:
         self.server.bind(self.addr)
         self.server.listen(1)
         self.running = False
+
+        # 请求接收缓冲区在启动时一次性分配，之后重复使用
+        self.recv_buf = game_instance.memory.alloc("http_recv", self.RECV_SIZE)
+        self.recv_mv = memoryview(self.recv_buf)
+        # /scores、/memory 的 JSON 直接写入此缓冲区，不在请求中拼接大字符串
+        self.json_buf = game_instance.memory.alloc("json_out", self.JSON_SIZE)
+        self.json_mv = memoryview(self.json_buf)
+        self.json_len = 0
+        self.json_keys = {}  # 键名 -> 编码好的 '"键名":' 片段，键名集合固定，缓存后不再分配
         
         # Web控制命令队列
         self.web_commands = []
@@ -38,7 +58,8 @@ class WebServer:
     def handle_request(self, client):
         """处理HTTP请求"""
         try:
-            request = client.recv(1024).decode('utf-8')
+            size = client.readinto(self.recv_buf) or 0
+            request = str(self.recv_mv[:min(size, self.REQUEST_LINE_MAX)], 'utf-8')
             request = request.split('\n')[0]
             
             # 解析请求路径
@@ -54,6 +75,7 @@ class WebServer:
                     response = self.create_json_response({"status": "success", "action": "right"})
                 elif path == 'restart':
                     self.game.reset_game()
+                    self.game.scores.flush()  # 重开时把上一局落盘，不必等到下一次游戏结束
                     response = self.create_json_response({"status": "success", "action": "restart"})
                 elif path == 'status':
                     status = {
@@ -64,6 +86,10 @@ class WebServer:
                         "humi": self.game.dht.humi
                     }
                     response = self.create_json_response(status)
+                elif path == 'scores':
+                    response = self.write_json(self.game.scores.summary())
+                elif path == 'memory':
+                    response = self.write_json(self.game.memory.report())
                 else:
                     response = self.create_html_page()
             else:
@@ -79,19 +105,91 @@ class WebServer:
         finally:
             client.close()
             
-    def create_json_response(self, data):
-        """创建JSON响应"""
+    def create_json_response(self, data, typed=False):
+        """创建JSON响应
+
+        typed 为 False 时所有值都输出为字符串（兼容原有接口）；
+        为 True 时整数和布尔值按 JSON 原生类型输出，供 /scores、/memory 使用。
+        """
         if isinstance(data, dict):
-            result = "{"
-            for i, (key, value) in enumerate(data.items()):
-                if i > 0:
-                    result += ","
-                result += f'"{key}":"{value}"'
-            result += "}"
-            return result
+            # 先收集片段再一次拼接，避免逐段 += 产生大量临时字符串
+            parts = [f'"{key}":{self.create_json_response(value, typed)}' for key, value in data.items()]
+            return "{" + ",".join(parts) + "}"
+        elif isinstance(data, list):
+            return "[" + ",".join(self.create_json_response(item, typed) for item in data) + "]"
+        elif typed and isinstance(data, bool):
+            return "true" if data else "false"
+        elif typed and isinstance(data, int):
+            return str(data)
         else:
             return f'"{data}"'
         
+    def write_json(self, data):
+        """把 data 写入启动时分配的 JSON 缓冲区，返回有效部分的 memoryview
+
+        整数和布尔值按 JSON 原生类型输出。缓冲区放不下时退回 create_json_response。
+        """
+        try:
+            self.json_len = self._write_value(data, 0)
+        except (ValueError, IndexError):
+            # 越界时 memoryview 赋值会抛出上述异常
+            return self.create_json_response(data, typed=True)
+        return self.json_mv[:self.json_len]
+
+    def _write_value(self, value, pos):
+        """把 value 写到缓冲区 pos 处，返回写完后的位置"""
+        mv = self.json_mv
+        if isinstance(value, dict):
+            mv[pos] = 0x7B  # {
+            pos += 1
+            for key, item in value.items():
+                fragment = self.json_keys.get(key)
+                if fragment is None:
+                    fragment = '"' + key + '":'
+                    if not STR_IS_BUFFER:
+                        fragment = fragment.encode()
+                    self.json_keys[key] = fragment
+                end = pos + len(fragment)
+                mv[pos:end] = fragment
+                pos = end
+                pos = self._write_value(item, pos) if type(item) is not int else self._write_int(item, pos)
+                mv[pos] = 0x2C  # ,
+                pos += 1
+            if value:
+                pos -= 1  # 覆盖最后一个逗号
+            mv[pos] = 0x7D  # }
+            return pos + 1
+        if isinstance(value, list):
+            mv[pos] = 0x5B  # [
+            pos += 1
+            for item in value:
+                pos = self._write_value(item, pos)
+                mv[pos] = 0x2C
+                pos += 1
+            if value:
+                pos -= 1
+            mv[pos] = 0x5D  # ]
+            return pos + 1
+        if type(value) is int:
+            return self._write_int(value, pos)
+        if isinstance(value, bool):
+            text = 'true' if value else 'false'
+        else:
+            text = '"' + str(value) + '"'
+        if not STR_IS_BUFFER:
+            text = text.encode()
+        end = pos + len(text)
+        mv[pos:end] = text
+        return end
+
+    def _write_int(self, value, pos):
+        text = str(value)
+        if not STR_IS_BUFFER:
+            text = text.encode()
+        end = pos + len(text)
+        self.json_mv[pos:end] = text
+        return end
+
     def create_html_page(self):
         """创建HTML控制页面"""
         html = """